@@ -0,0 +1,80 @@
+"""End-to-end checks for the WebSocket feed.
+
+The dashboard consumes binary frames, so these tests exercise the same
+bytes-in, JSON-out path a browser client sees: the initial snapshot over
+a real /ws handshake, a broadcast delivered through a per-client queue,
+and a burst coalesced by drain_client into a single array frame.
+"""
+
+import asyncio
+import json
+
+from starlette.testclient import TestClient
+
+import web_monitor
+
+
+class FakeWebSocket:
+    """Records sent frames like a connected client socket"""
+
+    def __init__(self):
+        self.frames = []
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+
+def test_initial_snapshot_is_parseable_binary_json():
+    with TestClient(web_monitor.app) as client:
+        with client.websocket_connect("/ws") as ws:
+            frame = ws.receive_bytes()
+            snapshot = json.loads(frame)
+
+            assert snapshot["type"] == "initial_data"
+            assert set(snapshot["funding_data"]) == set(web_monitor.symbols)
+            for key in ("liquidations", "trades", "whale_alerts"):
+                assert isinstance(snapshot[key], list)
+
+
+def test_broadcast_delivers_single_json_frame():
+    async def scenario():
+        fake = FakeWebSocket()
+        queue = asyncio.Queue(maxsize=web_monitor.CLIENT_QUEUE_SIZE)
+        web_monitor.connected_clients.add(fake)
+        web_monitor.client_queues[fake] = queue
+        drain = asyncio.create_task(web_monitor.drain_client(fake, queue))
+
+        try:
+            message = {'type': 'trade_add', 'item': {'symbol': 'BTC'}}
+            await web_monitor.broadcast_to_clients(message)
+            await asyncio.sleep(0.01)
+        finally:
+            drain.cancel()
+            web_monitor.connected_clients.discard(fake)
+            web_monitor.client_queues.pop(fake, None)
+
+        assert len(fake.frames) == 1
+        assert json.loads(fake.frames[0]) == message
+
+    asyncio.run(scenario())
+
+
+def test_drain_coalesces_bursts_into_one_array_frame():
+    async def scenario():
+        fake = FakeWebSocket()
+        queue = asyncio.Queue()
+        for n in range(3):
+            queue.put_nowait(
+                web_monitor.json_dumps({'type': 'trade_add', 'item': {'n': n}})
+            )
+
+        drain = asyncio.create_task(web_monitor.drain_client(fake, queue))
+        await asyncio.sleep(0.01)
+        drain.cancel()
+
+        assert len(fake.frames) == 1
+        burst = json.loads(fake.frames[0])
+        assert isinstance(burst, list)
+        assert [m['item']['n'] for m in burst] == [0, 1, 2]
+
+    asyncio.run(scenario())
@@ -1,13 +1,63 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
+from fastapi.responses import Response
 import asyncio
+import functools
 import json
 from datetime import datetime
+
+# orjson parses ~3x faster than stdlib json and serializes straight to bytes,
+# which matters on the per-message Binance hot path. Fall back to stdlib if
+# it isn't installed.
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+    def json_dumps(data) -> bytes:
+        return orjson.dumps(data)
+
+except ImportError:
+    def json_loads(data):
+        return json.loads(data)
+
+    def json_dumps(data) -> bytes:
+        return json.dumps(data).encode("utf-8")
+
+# msgspec decodes straight into the declared fields, skipping the dozen
+# unused keys in every aggTrade frame. Fall back to plain dict decoding
+# when it isn't installed.
+try:
+    import msgspec
+
+    class TradeMsg(msgspec.Struct):
+        p: str
+        q: str
+        T: int
+        m: bool
+
+    class TradeEnvelope(msgspec.Struct):
+        stream: str
+        data: TradeMsg
+
+    _trade_decoder = msgspec.json.Decoder(TradeEnvelope)
+
+    def decode_trade_frame(message):
+        envelope = _trade_decoder.decode(message)
+        data = envelope.data
+        return envelope.stream, data.p, data.q, data.T, data.m
+
+except ImportError:
+    def decode_trade_frame(message):
+        envelope = json_loads(message)
+        data = envelope['data']
+        return envelope['stream'], data['p'], data['q'], data['T'], data['m']
+
 import pytz
 from websockets import connect
 from collections import deque
-from typing import List
+from typing import Set
 import logging
 
 # Configure logging
@@ -16,20 +66,68 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Crypto Monitor", description="Real-time crypto trading monitor")
 
+# Timezone for displayed timestamps; looked up once, not per message
+EST = pytz.timezone("US/Eastern")
+
 # Data storage (same as terminal version)
 symbols = ['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifusdt']
 websocket_url_base = 'wss://fstream.binance.com/ws/'
 
-funding_data = {symbol: None for symbol in symbols}
+# Binance reports symbols uppercase ('BTCUSDT'); map back to our keys
+symbol_keys = {s.upper(): s for s in symbols}
+
+# Per-message classification tables: one lookup of interned strings
+# instead of ternary branches and string allocations in the hot loops
+LIQ_SIDE = {
+    'SELL': ('LONG LIQ', 'liquidation-long'),
+    'BUY': ('SHORT LIQ', 'liquidation-short')
+}
+TRADE_META = {
+    True: ('SELL', 'trade-sell'),
+    False: ('BUY', 'trade-buy')
+}
+WHALE_TIERS = [
+    (1_000_000, 'whale-mega', 'MEGA'),
+    (500_000, 'whale-huge', 'HUGE'),
+    (0, 'whale-big', 'BIG')
+]
+
+# Per-symbol entries are allocated once and mutated in place on each
+# tick, so the steady state creates no new dicts
+funding_data = {
+    symbol: {
+        'symbol_display': symbol.upper().replace('USDT', ''),
+        'funding_rate': 0.0,
+        'yearly_rate': 0.0,
+        'style_class': 'funding-normal'
+    }
+    for symbol in symbols
+}
+
+# Set when any funding entry changes; drained by funding_broadcaster so
+# ticks arriving close together collapse into one broadcast
+funding_dirty = asyncio.Event()
+FUNDING_BROADCAST_INTERVAL = 0.25
+
+# Reused broadcast envelope - funding_data is mutated in place, so the
+# same dict serializes fresh values on every broadcast
+FUNDING_UPDATE_MSG = {'type': 'funding_update', 'data': funding_data}
 recent_liquidations = deque(maxlen=25)
 recent_trades = deque(maxlen=30)
 whale_alerts = deque(maxlen=15)
 
-# Store connected WebSocket clients
-connected_clients: List[WebSocket] = []
+# Store connected WebSocket clients; a set gives O(1) add/remove and
+# broadcast order doesn't matter
+connected_clients: Set[WebSocket] = set()
 
-def format_usd(amount):
-    """Format USD amount with appropriate suffixes"""
+# Per-client send queues, drained by one task per client. A bounded queue
+# gives natural backpressure: a client that can't keep up gets dropped
+# instead of buffering payloads without limit.
+client_queues = {}
+CLIENT_QUEUE_SIZE = 256
+
+@functools.lru_cache(maxsize=4096)
+def _format_usd_cached(amount: int) -> str:
     if amount >= 1_000_000:
         return f"${amount/1_000_000:.2f}M"
     elif amount >= 1_000:
@@ -37,6 +135,26 @@ def format_usd(amount):
     else:
         return f"${amount:.0f}"
 
+def format_usd(amount):
+    """Format USD amount with appropriate suffixes"""
+    # Sub-dollar precision never shows in the output, so cache on the
+    # truncated integer value - trade sizes repeat heavily
+    return _format_usd_cached(int(amount))
+
+# UTC offset of US/Eastern, refreshed once a minute so DST changes are
+# picked up without paying datetime + strftime on every message
+_est_offset = {'secs': 0, 'expires': 0}
+
+def format_time_est(timestamp_ms):
+    """Format a millisecond epoch timestamp as HH:MM:SS in US/Eastern"""
+    secs = timestamp_ms // 1000
+    if secs >= _est_offset['expires']:
+        offset = datetime.fromtimestamp(secs, EST).utcoffset()
+        _est_offset['secs'] = int(offset.total_seconds())
+        _est_offset['expires'] = secs + 60
+    local = (secs + _est_offset['secs']) % 86400
+    return f"{local // 3600:02d}:{local // 60 % 60:02d}:{local % 60:02d}"
+
 def get_funding_style_class(yearly_rate):
     """Return CSS class based on funding rate"""
     if yearly_rate > 50:
@@ -50,59 +168,106 @@ def get_funding_style_class(yearly_rate):
     else:
         return "funding-normal"
 
+async def drain_client(websocket: WebSocket, queue: asyncio.Queue):
+    """Write queued payloads to one client, coalescing bursts"""
+    try:
+        while True:
+            payload = await queue.get()
+            pending = [payload]
+            while True:
+                try:
+                    pending.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            if len(pending) == 1:
+                await websocket.send_bytes(pending[0])
+            else:
+                # Payloads are pre-serialized JSON objects; a burst goes
+                # out as one array frame instead of several small ones
+                await websocket.send_bytes(b'[' + b','.join(pending) + b']')
+    except Exception:
+        connected_clients.discard(websocket)
+        client_queues.pop(websocket, None)
+
 async def broadcast_to_clients(data: dict):
-    """Send data to all connected WebSocket clients"""
+    """Queue data for delivery to all connected WebSocket clients"""
     if connected_clients:
-        disconnected = []
-        for client in connected_clients:
+        # Serialize once, not once per client; the per-client drain tasks
+        # do the actual socket writes so enqueueing never blocks
+        payload = json_dumps(data)
+        slow = []
+        for client in list(connected_clients):
+            queue = client_queues.get(client)
+            if queue is None:
+                continue
             try:
-                await client.send_text(json.dumps(data))
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Slow consumer - drop it rather than buffer unbounded
+                slow.append(client)
+
+        for client in slow:
+            connected_clients.discard(client)
+            client_queues.pop(client, None)
+            try:
+                await client.close()
             except Exception:
-                disconnected.append(client)
-        
-        # Remove disconnected clients
-        for client in disconnected:
-            connected_clients.remove(client)
+                pass
+
+async def binance_funding_stream():
+    """Stream funding data for all symbols over one markPrice connection"""
+    # !markPrice@arr delivers every symbol's mark price in a single frame,
+    # so one connection and one decode replace six
+    websocket_url = f'{websocket_url_base}!markPrice@arr'
 
-async def binance_funding_stream(symbol):
-    """Connect to Binance WebSocket and stream funding data"""
-    websocket_url = f'{websocket_url_base}{symbol}@markPrice'
-    
     while True:
         try:
             async with connect(websocket_url) as websocket:
                 while True:
                     try:
                         message = await websocket.recv()
-                        data = json.loads(message)
-                        
-                        symbol_display = data['s'].replace('USDT', '').upper()
-                        funding_rate = float(data['r']) * 100
-                        yearly_funding_rate = funding_rate * 3 * 365
-                        
-                        funding_data[symbol] = {
-                            'symbol_display': symbol_display,
-                            'funding_rate': funding_rate,
-                            'yearly_rate': yearly_funding_rate,
-                            'style_class': get_funding_style_class(yearly_funding_rate)
-                        }
-                        
-                        # Broadcast funding data update
-                        await broadcast_to_clients({
-                            'type': 'funding_update',
-                            'data': funding_data
-                        })
-                        
-                    except json.JSONDecodeError:
+                        events = json_loads(message)
+
+                        updated = False
+                        for data in events:
+                            symbol = symbol_keys.get(data['s'])
+                            if symbol is None:
+                                continue
+
+                            funding_rate = float(data['r']) * 100
+                            yearly_funding_rate = funding_rate * 3 * 365
+
+                            # Mutate the pre-allocated entry in place
+                            entry = funding_data[symbol]
+                            entry['funding_rate'] = funding_rate
+                            entry['yearly_rate'] = yearly_funding_rate
+                            entry['style_class'] = get_funding_style_class(yearly_funding_rate)
+                            updated = True
+
+                        if updated:
+                            # Mark dirty; funding_broadcaster coalesces
+                            # ticks into one broadcast per interval
+                            funding_dirty.set()
+
+                    except ValueError:
                         continue
                     except Exception as e:
-                        logger.error(f"Error in funding stream {symbol}: {e}")
+                        logger.error(f"Error in funding stream: {e}")
                         break
-                        
+
         except Exception as e:
-            logger.error(f"Connection error for funding {symbol}: {e}")
+            logger.error(f"Connection error for funding stream: {e}")
             await asyncio.sleep(5)
 
+async def funding_broadcaster():
+    """Broadcast coalesced funding updates at most once per interval"""
+    while True:
+        await funding_dirty.wait()
+        funding_dirty.clear()
+        await broadcast_to_clients(FUNDING_UPDATE_MSG)
+        await asyncio.sleep(FUNDING_BROADCAST_INTERVAL)
+
 async def binance_liquidation_stream():
     """Connect to Binance liquidation WebSocket"""
     websocket_url = 'wss://fstream.binance.com/ws/!forceOrder@arr'
@@ -113,33 +278,40 @@ async def binance_liquidation_stream():
                 while True:
                     try:
                         msg = await websocket.recv()
-                        order_data = json.loads(msg)['o']
-                        symbol = order_data['s'].replace('USDT', '')
-                        side = order_data['S']
-                        timestamp = int(order_data['T'])
+                        order_data = json_loads(msg)['o']
                         filled_quantity = float(order_data['z'])
                         price = float(order_data['p'])
                         usd_size = filled_quantity * price
-                        est = pytz.timezone("US/Eastern")
-                        time_est = datetime.fromtimestamp(timestamp / 1000, est).strftime('%H:%M:%S')
-                        
-                        if usd_size >= 5000:
-                            liquidation = {
-                                'symbol': symbol[:4],
-                                'side': side,
-                                'side_text': 'LONG LIQ' if side == 'SELL' else 'SHORT LIQ',
-                                'usd_size': format_usd(usd_size),
-                                'time': time_est,
-                                'color_class': 'liquidation-long' if side == 'SELL' else 'liquidation-short'
-                            }
-                            
-                            recent_liquidations.appendleft(liquidation)
-                            
-                            await broadcast_to_clients({
-                                'type': 'liquidation_update',
-                                'data': list(recent_liquidations)
-                            })
-                            
+
+                        # Bail before any formatting work for the
+                        # liquidations too small to display
+                        if usd_size < 5000:
+                            continue
+
+                        symbol = order_data['s'].replace('USDT', '')
+                        side = order_data['S']
+                        time_est = format_time_est(int(order_data['T']))
+
+                        side_text, color_class = LIQ_SIDE[side]
+                        liquidation = {
+                            'symbol': symbol[:4],
+                            'side': side,
+                            'side_text': side_text,
+                            'usd_size': format_usd(usd_size),
+                            'time': time_est,
+                            'color_class': color_class
+                        }
+
+                        recent_liquidations.append(liquidation)
+
+                        # Send only the new entry; clients keep their
+                        # own bounded list
+                        await broadcast_to_clients({
+                            'type': 'liquidation_add',
+                            'item': liquidation
+                        })
+
+
                     except Exception as e:
                         logger.error(f"Error in liquidation stream: {e}")
                         break
@@ -148,104 +320,131 @@ async def binance_liquidation_stream():
             logger.error(f"Liquidation connection error: {e}")
             await asyncio.sleep(5)
 
-async def binance_trade_stream(symbol):
-    """Connect to Binance trade WebSocket"""
-    websocket_url = f"{websocket_url_base}{symbol}@aggTrade"
-    
+async def binance_trade_stream():
+    """Stream aggTrade data for all symbols over one combined connection"""
+    # The combined-stream endpoint multiplexes every symbol's aggTrade
+    # feed over a single connection; frames arrive wrapped in a
+    # {'stream': ..., 'data': ...} envelope
+    streams = "/".join(f"{s}@aggTrade" for s in symbols)
+    websocket_url = f"wss://fstream.binance.com/stream?streams={streams}"
+
     while True:
         try:
             async with connect(websocket_url) as websocket:
                 while True:
                     try:
                         message = await websocket.recv()
-                        data = json.loads(message)
-                        
-                        price = float(data['p'])
-                        quantity = float(data['q'])
-                        trade_time = int(data['T'])
-                        is_buyer_maker = data['m']
-                        
-                        usd_size = price * quantity 
-                        
-                        if usd_size >= 15000:
-                            trade_type = 'SELL' if is_buyer_maker else "BUY"
-                            est = pytz.timezone('US/Eastern')
-                            readable_trade_time = datetime.fromtimestamp(trade_time / 1000, est).strftime('%H:%M:%S')
-                            display_symbol = symbol.upper().replace('USDT', '')
-                            
-                            trade = {
+                        stream, p, q, trade_time, is_buyer_maker = decode_trade_frame(message)
+
+                        price = float(p)
+                        quantity = float(q)
+                        usd_size = price * quantity
+
+                        # The vast majority of trades fall below the
+                        # display threshold - bail before time formatting
+                        # or any dict building
+                        if usd_size < 15000:
+                            continue
+
+                        symbol = stream.split('@', 1)[0]
+                        trade_type, color_class = TRADE_META[is_buyer_maker]
+                        readable_trade_time = format_time_est(trade_time)
+                        display_symbol = symbol.upper().replace('USDT', '')
+
+                        usd_size_str = format_usd(usd_size)
+
+                        trade = {
+                            'symbol': display_symbol[:4],
+                            'type': trade_type,
+                            'usd_size': usd_size_str,
+                            'price': price,
+                            'time': readable_trade_time,
+                            'color_class': color_class
+                        }
+
+                        recent_trades.append(trade)
+
+                        # Also add to whale alerts if $100K+
+                        if usd_size >= 100000:
+                            # Determine whale size class
+                            for threshold, whale_class, size_indicator in WHALE_TIERS:
+                                if usd_size >= threshold:
+                                    break
+
+                            # Build directly from locals rather than
+                            # copying and mutating the trade dict
+                            whale_alert = {
                                 'symbol': display_symbol[:4],
                                 'type': trade_type,
-                                'usd_size': format_usd(usd_size),
+                                'usd_size': usd_size_str,
                                 'price': price,
                                 'time': readable_trade_time,
-                                'color_class': 'trade-buy' if trade_type == 'BUY' else 'trade-sell'
+                                'color_class': color_class,
+                                'usd_value': usd_size,
+                                'whale_class': whale_class,
+                                'size_indicator': size_indicator
                             }
-                            
-                            recent_trades.appendleft(trade)
-                            
-                            # Also add to whale alerts if $100K+
-                            if usd_size >= 100000:
-                                whale_alert = trade.copy()
-                                whale_alert['usd_value'] = usd_size
-                                
-                                # Determine whale size class
-                                if usd_size >= 1000000:
-                                    whale_alert['whale_class'] = 'whale-mega'
-                                    whale_alert['size_indicator'] = 'MEGA'
-                                elif usd_size >= 500000:
-                                    whale_alert['whale_class'] = 'whale-huge'
-                                    whale_alert['size_indicator'] = 'HUGE'
-                                else:
-                                    whale_alert['whale_class'] = 'whale-big'
-                                    whale_alert['size_indicator'] = 'BIG'
-                                
-                                whale_alerts.appendleft(whale_alert)
-                                
-                                await broadcast_to_clients({
-                                    'type': 'whale_alert_update',
-                                    'data': list(whale_alerts)
-                                })
-                            
+
+                            whale_alerts.append(whale_alert)
+
                             await broadcast_to_clients({
-                                'type': 'trade_update', 
-                                'data': list(recent_trades)
+                                'type': 'whale_alert_add',
+                                'item': whale_alert
                             })
-                            
+
+                        await broadcast_to_clients({
+                            'type': 'trade_add',
+                            'item': trade
+                        })
+
+
                     except Exception as e:
-                        logger.error(f"Error in trade stream {symbol}: {e}")
+                        logger.error(f"Error in trade stream: {e}")
                         break
-                        
+
         except Exception as e:
-            logger.error(f"Trade connection error for {symbol}: {e}")
+            logger.error(f"Trade connection error: {e}")
             await asyncio.sleep(5)
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time data"""
     await websocket.accept()
-    connected_clients.append(websocket)
-    
+
     # Send initial data
-    await websocket.send_text(json.dumps({
+    await websocket.send_bytes(json_dumps({
         'type': 'initial_data',
         'funding_data': funding_data,
-        'liquidations': list(recent_liquidations),
-        'trades': list(recent_trades),
-        'whale_alerts': list(whale_alerts)
+        # Deques append newest-last; the dashboard renders newest-first
+        'liquidations': list(reversed(recent_liquidations)),
+        'trades': list(reversed(recent_trades)),
+        'whale_alerts': list(reversed(whale_alerts))
     }))
-    
+
+    # Register the per-client send queue and its drain task, then start
+    # receiving broadcasts
+    queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    client_queues[websocket] = queue
+    drain_task = asyncio.create_task(drain_client(websocket, queue))
+    connected_clients.add(websocket)
+
     try:
+        # Hold the connection open without parsing inbound frames - the
+        # dashboard never sends anything. The raw ASGI receive yields a
+        # disconnect message when the client goes away; dead clients are
+        # also reaped send-side in broadcast_to_clients.
         while True:
-            # Keep connection alive
-            await websocket.receive_text()
-    except WebSocketDisconnect:
-        connected_clients.remove(websocket)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        connected_clients.discard(websocket)
+        client_queues.pop(websocket, None)
+        drain_task.cancel()
 
-@app.get("/", response_class=HTMLResponse)
-async def get_dashboard():
-    """Serve the main dashboard HTML"""
-    return """
+# The dashboard page is static; keep it as a module-level constant so it
+# is encoded to bytes once at import rather than on every GET
+DASHBOARD_HTML = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -426,8 +625,21 @@ async def get_dashboard():
     <script>
         const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
         const ws = new WebSocket(`${protocol}//${window.location.host}/ws`);
+        // The server sends binary frames (orjson serializes to bytes);
+        // without this the browser hands onmessage a Blob
+        ws.binaryType = 'arraybuffer';
+        const decoder = new TextDecoder();
         const status = document.getElementById('status');
-        
+
+        // Local ring buffers; the server sends a full snapshot on connect
+        // and single-item adds afterwards
+        let liquidations = [];
+        let trades = [];
+        let whaleAlerts = [];
+        const MAX_LIQUIDATIONS = 25;
+        const MAX_TRADES = 30;
+        const MAX_WHALE_ALERTS = 15;
+
         ws.onopen = function() {
             status.textContent = '🟢 Connected';
             status.className = 'status connected';
@@ -439,30 +651,50 @@ async def get_dashboard():
         };
         
         ws.onmessage = function(event) {
-            const data = JSON.parse(event.data);
-            
+            const text = typeof event.data === 'string'
+                ? event.data
+                : decoder.decode(event.data);
+            const parsed = JSON.parse(text);
+            // Bursty updates arrive coalesced as an array of messages
+            if (Array.isArray(parsed)) {
+                parsed.forEach(handleMessage);
+            } else {
+                handleMessage(parsed);
+            }
+        };
+
+        function handleMessage(data) {
             switch(data.type) {
                 case 'initial_data':
                     updateFunding(data.funding_data);
-                    updateLiquidations(data.liquidations);
-                    updateTrades(data.trades);
-                    updateWhaleAlerts(data.whale_alerts);
+                    liquidations = data.liquidations.slice(0, MAX_LIQUIDATIONS);
+                    trades = data.trades.slice(0, MAX_TRADES);
+                    whaleAlerts = data.whale_alerts.slice(0, MAX_WHALE_ALERTS);
+                    updateLiquidations(liquidations);
+                    updateTrades(trades);
+                    updateWhaleAlerts(whaleAlerts);
                     break;
                 case 'funding_update':
                     updateFunding(data.data);
                     break;
-                case 'liquidation_update':
-                    updateLiquidations(data.data);
+                case 'liquidation_add':
+                    liquidations.unshift(data.item);
+                    liquidations = liquidations.slice(0, MAX_LIQUIDATIONS);
+                    updateLiquidations(liquidations);
                     break;
-                case 'trade_update':
-                    updateTrades(data.data);
+                case 'trade_add':
+                    trades.unshift(data.item);
+                    trades = trades.slice(0, MAX_TRADES);
+                    updateTrades(trades);
                     break;
-                case 'whale_alert_update':
-                    updateWhaleAlerts(data.data);
+                case 'whale_alert_add':
+                    whaleAlerts.unshift(data.item);
+                    whaleAlerts = whaleAlerts.slice(0, MAX_WHALE_ALERTS);
+                    updateWhaleAlerts(whaleAlerts);
                     break;
             }
-        };
-        
+        }
+
         function updateFunding(fundingData) {
             const tbody = document.getElementById('funding-data');
             tbody.innerHTML = '';
@@ -525,25 +757,40 @@ async def get_dashboard():
 </body>
 </html>
 """
+DASHBOARD_HTML_BYTES = DASHBOARD_HTML.encode("utf-8")
+
+@app.get("/")
+async def get_dashboard():
+    """Serve the main dashboard HTML"""
+    return Response(
+        content=DASHBOARD_HTML_BYTES,
+        media_type="text/html",
+        headers={"Cache-Control": "public, max-age=300"}
+    )
 
 # Background tasks to start the WebSocket streams
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks for WebSocket streams"""
     
-    # Start funding rate streams
-    for symbol in symbols:
-        asyncio.create_task(binance_funding_stream(symbol))
+    # Start the shared funding rate stream
+    asyncio.create_task(binance_funding_stream())
+
+    # Coalesces funding ticks into periodic broadcasts
+    asyncio.create_task(funding_broadcaster())
     
     # Start liquidation stream
     asyncio.create_task(binance_liquidation_stream())
     
-    # Start trade streams
-    for symbol in symbols:
-        asyncio.create_task(binance_trade_stream(symbol))
+    # Start the combined trade stream
+    asyncio.create_task(binance_trade_stream())
     
     logger.info("🚀 Crypto Monitor started - all WebSocket streams active")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop's libuv event loop cuts per-message overhead in the stream
+    # and broadcast coroutines; httptools speeds up request parsing.
+    # Both ship with uvicorn[standard].
+    uvicorn.run(app, host="0.0.0.0", port=8000,
+                loop="uvloop", http="httptools", ws="websockets")
\ No newline at end of file